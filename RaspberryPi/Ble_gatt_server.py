@@ -6,12 +6,16 @@ Using bluez DBus interface for Raspberry Pi
 
 Requirements: 
     sudo apt-get install python3-dbus python3-gi python3-gi-cairo gir1.2-gtk-3.0 
-    pip3 install pydbus pyserial numpy 
+    pip3 install pydbus pyserial numpy numba 
+    python3 build_native.py   # optional: AOT-compile the frame parser 
 
 Run with: 
     sudo python3 rd03d_ble_gatt_server.py --port /dev/ttyUSB0 
 """ 
 import argparse 
+import io 
+import os 
+import select 
 import struct 
 import time 
 import math 
@@ -26,16 +30,48 @@ import dbus.service
 import serial 
 import numpy as np 
 from gi.repository import GLib 
-
+ 
+import radar_kernels 
+from radar_kernels import FRAME_LEN, ROW_LEN, TARGETS_PER_FRAME 
+ 
+# radar_parse is built by build_native.py from radar_kernels.py; a build 
+# from an older radar_kernels.py is ignored rather than trusted 
+NATIVE_PARSER_STALE = False 
+try: 
+    import radar_parse 
+    _native_hash = getattr(radar_parse, 'kernel_hash', lambda: None)() 
+    NATIVE_PARSER_AVAILABLE = _native_hash == radar_kernels.source_hash() 
+    NATIVE_PARSER_STALE = not NATIVE_PARSER_AVAILABLE 
+except ImportError: 
+    NATIVE_PARSER_AVAILABLE = False 
+ 
+# Numba itself takes seconds to import on a Pi, so only load it when 
+# there is no native build to use instead 
+NUMBA_AVAILABLE = False 
+if not NATIVE_PARSER_AVAILABLE: 
+    try: 
+        from numba import njit 
+        NUMBA_AVAILABLE = True 
+    except ImportError: 
+        pass 
+ 
+COMPILED_PARSER_AVAILABLE = NATIVE_PARSER_AVAILABLE or NUMBA_AVAILABLE 
+ 
 # Import radar constants 
 FRAME_HEADER = b"\xAA\xFF\x03\x00" 
 FRAME_TAIL = b"\x55\xCC" 
-FRAME_LEN = 30 
-TARGETS_PER_FRAME = 3 
+_TAIL_U16 = int.from_bytes(FRAME_TAIL, 'little') 
+_TARGET_S = struct.Struct('<HHHH')  # x, y, speed, gate per target slot 
+BUFFER_COMPACT_THRESHOLD = 8192  # bytes consumed before the RX buffer is compacted 
+RX_RING_SIZE = 8192  # uint8 receive buffer used by the compiled reader path 
 
 # Position scaling for visualization (screen exaggeration) 
 POSITION_SCALE = 3.0  # try 3.0–5.0; increase if you want more motion 
 MAX_POSITION_METERS = 10.0  # clamp to your app's grid range (-10..10) 
+ 
+# BLE detection packet: x, y, depth, snr, confidence, objectType 
+_RADAR_PACKET = struct.Struct('<fffffB') 
+_INV_SNR_SPAN = 1.0 / 30.0  # confidence = (snr - 5) / 30 
 
 # BLE UUIDs matching Android app 
 SERVICE_UUID = "00001101-0000-1000-8000-00805f9b34fb" 
@@ -59,6 +95,27 @@ OBJECT_TYPE_UNKNOWN = 0
 OBJECT_TYPE_PERSON = 1 
 OBJECT_TYPE_OBJECT = 2 
 OBJECT_TYPE_GHOST = 3 
+ 
+# Classification thresholds in the radar's native units 
+CLASSIFY_MIN_RANGE_MM = 500        # 0.5 m 
+CLASSIFY_MAX_RANGE_MM = 8000       # 8.0 m 
+CLASSIFY_MAX_SPEED_CM_S = 400      # 4.0 m/s 
+CLASSIFY_STATIC_SPEED_CM_S = 5     # 0.05 m/s 
+ 
+if NATIVE_PARSER_AVAILABLE: 
+    # Ahead-of-time build of radar_kernels.consume, so no JIT warm-up. 
+    # pycc exports can't release the GIL, unlike the nogil JIT kernel, so 
+    # the mainloop waits on each call; that is one RX buffer (<= 8 KB) per 
+    # read. Remove radar_parse to go back to the JIT kernel 
+    _consume = radar_parse.consume 
+elif NUMBA_AVAILABLE: 
+    _consume = njit(nogil=True, cache=True)(radar_kernels.consume) 
+ 
+    # Compile now so the reader thread doesn't stall on the first frame 
+    _consume( 
+        np.zeros(FRAME_LEN, dtype=np.uint8), 0, FRAME_LEN, 
+        np.zeros((TARGETS_PER_FRAME, ROW_LEN), dtype=np.int32), 
+    ) 
 
 class RD03DRadar: 
     """Reader/parser for RD-03D radar""" 
@@ -71,7 +128,29 @@ class RD03DRadar:
             stopbits=serial.STOPBITS_ONE, 
             timeout=timeout, 
         ) 
+        # Larger driver RX buffer so a briefly preempted reader doesn't drop 
+        # bytes (only some pyserial backends support this) 
+        if hasattr(self.ser, "set_buffer_size"): 
+            try: 
+                self.ser.set_buffer_size(rx_size=4096) 
+            except (serial.SerialException, ValueError) as e: 
+                logging.warning(f"Could not enlarge serial RX buffer: {e}") 
+ 
+        if COMPILED_PARSER_AVAILABLE: 
+            # Raw bytes land in a fixed uint8 buffer that _consume scans in 
+            # place, and decoded rows go into a reusable output array 
+            self._ring = np.zeros(RX_RING_SIZE, dtype=np.uint8) 
+            self._ring_view = memoryview(self._ring) 
+            self._ring_start = 0 
+            self._ring_end = 0 
+            self._rows = np.zeros((TARGETS_PER_FRAME, ROW_LEN), dtype=np.int32) 
+            # Read the tty fd straight into that buffer: pyserial's readinto 
+            # is read() plus a copy, so it would still allocate per call 
+            self._fio = io.FileIO(self.ser.fileno(), 'rb', closefd=False) 
+ 
+        # read_frame() works on every path, so its buffer always exists 
         self.buffer = bytearray() 
+        self._rpos = 0  # read cursor into self.buffer 
         logging.info(f"Radar initialized on {port} at {baudrate} baud") 
 
     def close(self): 
@@ -79,66 +158,153 @@ class RD03DRadar:
             self.ser.close() 
 
     @staticmethod 
-    def _decode_signed_mag(u16: int) -> int: 
-        if u16 == 0: 
-            return 0 
-        sign_positive = bool(u16 & 0x8000) 
-        mag = u16 & 0x7FFF 
-        return mag if sign_positive else -mag 
+    def _decode_targets(frame) -> List[list]: 
+        # Same row layout as _consume. For three slots a cached 
+        # Struct beats NumPy ufuncs, whose per-call overhead dominates here 
+        rows = [] 
+        for idx in range(TARGETS_PER_FRAME): 
+            x_raw, y_raw, v_raw, d_raw = _TARGET_S.unpack_from(frame, 4 + idx * 8) 
+ 
+            # x, y and speed are signed-magnitude (bit 15 set = positive) 
+            x_mm = (x_raw & 0x7FFF) if x_raw & 0x8000 else -(x_raw & 0x7FFF) 
+            y_mm = (y_raw & 0x7FFF) if y_raw & 0x8000 else -(y_raw & 0x7FFF) 
+            speed_cm_s = (v_raw & 0x7FFF) if v_raw & 0x8000 else -(v_raw & 0x7FFF) 
+ 
+            present = 1 if (x_raw or y_raw or v_raw or d_raw) else 0 
+            rows.append([ 
+                x_mm, y_mm, math.isqrt(x_mm * x_mm + y_mm * y_mm), speed_cm_s, d_raw, present 
+            ]) 
+        return rows 
 
+    def _compact_buffer(self): 
+        # Only shift the unread tail down once a lot has been consumed, so 
+        # the memmove cost is amortised over many frames 
+        if self._rpos >= len(self.buffer): 
+            self.buffer.clear() 
+            self._rpos = 0 
+        elif self._rpos > BUFFER_COMPACT_THRESHOLD: 
+            del self.buffer[: self._rpos] 
+            self._rpos = 0 
+ 
     def _extract_frame_from_buffer(self): 
+        buf = self.buffer 
         while True:
-            idx = self.buffer.find(FRAME_HEADER) 
+            idx = buf.find(FRAME_HEADER, self._rpos) 
             if idx < 0: 
-                if len(self.buffer) > 3: 
-                    self.buffer = self.buffer[-3:] 
+                # Keep the last 3 bytes, they may be the start of a header 
+                self._rpos = max(self._rpos, len(buf) - 3) 
+                self._compact_buffer() 
                 return None 
  
-            if len(self.buffer) - idx < FRAME_LEN: 
+            if len(buf) - idx < FRAME_LEN: 
+                self._rpos = idx 
+                self._compact_buffer() 
                 return None 
  
-            frame = self.buffer[idx: idx + FRAME_LEN] 
-            del self.buffer[: idx + FRAME_LEN] 
+            self._rpos = idx + FRAME_LEN 
  
-            if frame[-2:] != FRAME_TAIL: 
+            # Compare the tail as one u16 rather than slicing out two bytes 
+            if (buf[idx + FRAME_LEN - 2] | (buf[idx + FRAME_LEN - 1] << 8)) != _TAIL_U16: 
                 continue
  
+            frame = buf[idx: idx + FRAME_LEN] 
+            self._compact_buffer() 
             return frame 
  
-    def read_frame(self): 
+    def _read_chunk(self) -> bytes: 
         try: 
-            chunk = self.ser.read(64) 
+            # Drain everything already queued in one call without waiting 
+            # on more; only block (up to the port timeout) when idle 
+            n = self.ser.in_waiting 
+            return self.ser.read(n or 64) 
         except serial.SerialException as e: 
             logging.error(f"Serial read error: {e}") 
             time.sleep(0.1) 
-            return None 
+            return b"" 
+ 
+    def _read_into(self, view: memoryview) -> int: 
+        try: 
+            # Wait up to the port timeout for data, then take everything 
+            # queued with a single read(2) into view (the fd is non-blocking) 
+            ready, _, _ = select.select([self._fio], [], [], self.ser.timeout) 
+            if not ready: 
+                return 0 
+            n = self._fio.readinto(view) 
+            if n == 0: 
+                # Same condition pyserial treats as a disconnected device 
+                raise OSError("device reports readiness to read but returned no data") 
+            return n or 0 
+        except OSError as e: 
+            logging.error(f"Serial read error: {e}") 
+            time.sleep(0.1) 
+            return 0 
  
+    def read_frame(self): 
+        chunk = self._read_chunk() 
         if chunk: 
             self.buffer.extend(chunk) 
         return self._extract_frame_from_buffer() 
  
+    def read_targets(self): 
+        """Read from the port and return targets of the newest complete frame""" 
+        if not COMPILED_PARSER_AVAILABLE: 
+            frame = self.read_frame() 
+            if not frame: 
+                return None 
+            # Skip to the newest complete frame already buffered, as _consume does 
+            while True: 
+                newer = self._extract_frame_from_buffer() 
+                if newer is None: 
+                    break 
+                frame = newer 
+            return self.parse_targets(frame) 
+ 
+        # Move the unconsumed tail (less than one frame) back to the front 
+        if self._ring_start: 
+            tail = self._ring_end - self._ring_start 
+            self._ring[:tail] = self._ring[self._ring_start:self._ring_end] 
+            self._ring_start = 0 
+            self._ring_end = tail 
+ 
+        n = self._read_into(self._ring_view[self._ring_end:]) 
+        if not n: 
+            return None 
+        self._ring_end += n 
+ 
+        self._ring_start, n_targets = _consume( 
+            self._ring, self._ring_start, self._ring_end, self._rows 
+        ) 
+        if n_targets <= 0: 
+            return None 
+        return self._rows_to_targets(self._rows.tolist()) 
+ 
     def parse_targets(self, frame: bytes): 
         assert len(frame) == FRAME_LEN 
  
-        targets = [] 
-        offset = 4 
- 
-        for idx in range(TARGETS_PER_FRAME): 
-            segment = frame[offset: offset + 8] 
-            offset += 8 
+        if COMPILED_PARSER_AVAILABLE: 
+            # Same kernel as the reader loop. frombuffer over bytes is 
+            # read-only, which would make Numba compile a second 
+            # specialization; copy into the writable layout it was warmed for 
+            buf = np.frombuffer(frame, dtype=np.uint8).copy() 
+            # parse_targets decodes the slots without validating the frame 
+            # (read_frame already did), so give _consume's scan the header 
+            # and tail it looks for 
+            buf[:4] = (0xAA, 0xFF, 0x03, 0x00) 
+            buf[FRAME_LEN - 2:] = (0x55, 0xCC) 
+            out = np.zeros((TARGETS_PER_FRAME, ROW_LEN), dtype=np.int32) 
+            _consume(buf, 0, FRAME_LEN, out) 
+            rows = out.tolist() 
+        else: 
+            rows = self._decode_targets(frame) 
+        return self._rows_to_targets(rows) 
  
-            if segment == b"\x00" * 8: 
+    @staticmethod 
+    def _rows_to_targets(rows: List[list]): 
+        targets = [] 
+        for idx, (x_mm, y_mm, r_mm, speed_cm_s, dist_gate_mm, present) in enumerate(rows): 
+            # Empty slots are decided on the raw bytes, not the decoded values 
+            if not present: 
                 continue 
- 
-            x_raw, y_raw, v_raw, d_raw = struct.unpack_from("<HHHH", segment, 0) 
- 
-            x_mm = self._decode_signed_mag(x_raw) 
-            y_mm = self._decode_signed_mag(y_raw) 
-            speed_cm_s = self._decode_signed_mag(v_raw) 
-            dist_gate_mm = d_raw 
- 
-            r_mm = int(math.hypot(x_mm, y_mm)) 
- 
             targets.append({ 
                 "id": idx + 1, 
                 "x_mm": x_mm, 
@@ -244,17 +410,34 @@ class Characteristic(dbus.service.Object):
         self.service = service 
         self.flags = flags 
         self.notifying = False 
-        self.value: List[dbus.Byte] = [] 
+        self._value_bytes = b'' 
+        self._value_dbus_array: Optional[dbus.Array] = None 
         dbus.service.Object.__init__(self, bus, self.path) 
         service.add_characteristic(self) 
  
+    @property 
+    def value(self) -> bytes: 
+        return self._value_bytes 
+ 
+    @value.setter 
+    def value(self, value: bytes): 
+        self._value_bytes = value 
+        self._value_dbus_array = None 
+ 
+    def get_value_array(self) -> dbus.Array: 
+        # Built lazily and shared by ReadValue, GetAll and notifications 
+        # until the value changes 
+        if self._value_dbus_array is None: 
+            self._value_dbus_array = dbus.Array(self._value_bytes, signature='y') 
+        return self._value_dbus_array 
+ 
     def get_properties(self): 
         return { 
             GATT_CHRC_IFACE: { 
                 'Service': self.service.get_path(), 
                 'UUID': self.uuid, 
                 'Flags': self.flags, 
-                'Value': dbus.Array(self.value, signature='y'), 
+                'Value': self.get_value_array(), 
                 'Notifying': self.notifying 
             } 
         } 
@@ -278,12 +461,12 @@ class Characteristic(dbus.service.Object):
     @dbus.service.method(GATT_CHRC_IFACE, in_signature='a{sv}', out_signature='ay') 
     def ReadValue(self, otions): 
 
-        return self.value 
+        return self.get_value_array() 
  
     # BlueZ WriteValue(ay value, dict options) -> () 
     @dbus.service.method(GATT_CHRC_IFACE, in_signature='aya{sv}', out_signature='') 
     def WriteValue(self, value, options): 
-        self.value = value 
+        self.value = bytes(value) 
         if self.uuid == CHAR_COMMAND_UUID: 
             self.handle_command(value) 
  
@@ -293,6 +476,7 @@ class Characteristic(dbus.service.Object):
             return 
         self.notifying = True 
         logging.info(f'Notifications enabled for {self.uuid}') 
+        self.on_notify_start() 
  
     @dbus.service.method(GATT_CHRC_IFACE, in_signature='', out_signature='') 
     def StopNotify(self): 
@@ -300,17 +484,26 @@ class Characteristic(dbus.service.Object):
             return 
         self.notifying = False 
         logging.info(f'Notifications disabled for {self.uuid}') 
+        self.on_notify_stop() 
  
-    def update_value(self, value): 
+    def update_value(self, value: bytes): 
         self.value = value 
         if self.notifying: 
             self.PropertiesChanged( 
                 GATT_CHRC_IFACE, 
-                {'Value': dbus.Array(value, signature='y')}, 
+                {'Value': self.get_value_array()}, 
                 [] 
             ) 
  
     def handle_command(self, data): 
+        """Override in subclass""" 
+        pass 
+ 
+    def on_notify_start(self): 
+        """Override in subclass""" 
+        pass 
+ 
+    def on_notify_stop(self): 
         """Override in subclass"""
         pass 
  
@@ -324,32 +517,53 @@ class RadarDataCharacteristic(Characteristic):
         ) 
         self.radar_queue: Optional[queue.Queue] = None 
  
+        # Last sent detection quantised to 1 cm, to skip duplicate notifies 
+        self._last_key: Optional[tuple] = None 
+ 
+        # Read end of the pipe the reader thread pokes after each frame, and 
+        # the GLib watch on it; the watch only exists while a central is 
+        # subscribed (see on_notify_start/on_notify_stop) 
+        self.wake_fd: Optional[int] = None 
+        self._watch_id: Optional[int] = None 
+ 
         # These are kept for potential future use (object tracking), 
         # but not used in the simplified packet format. 
         self.object_tracker = {} 
         self.next_object_id = 1 
         self.base_timestamp = int(time.time() * 1000) 
  
-        # Start update loop at ~20 Hz 
-        GLib.timeout_add(50, self.update_radar_data) 
- 
-    def set_radar_queue(self, queue_obj: queue.Queue): 
+    def set_radar_queue(self, queue_obj: queue.Queue, wake_fd: int): 
         self.radar_queue = queue_obj 
+        self.wake_fd = wake_fd 
+ 
+    def on_notify_start(self): 
+        # Wake the mainloop only when the reader thread has a new frame 
+        if self._watch_id is None and self.wake_fd is not None: 
+            self._watch_id = GLib.unix_fd_add_full( 
+                GLib.PRIORITY_DEFAULT, self.wake_fd, GLib.IO_IN, self._on_radar_ready 
+            ) 
+ 
+    def on_notify_stop(self): 
+        if self._watch_id is not None: 
+            GLib.source_remove(self._watch_id) 
+            self._watch_id = None 
+        # Resend on the next subscription even if the scene is static 
+        self._last_key = None 
  
     def classify_target(self, target: Dict) -> tuple: 
-        speed_m_s = abs(target["speed_cm_s"]) / 100.0 
-        r_m = target["r_mm"] / 1000.0 
+        speed_cm_s = abs(target["speed_cm_s"]) 
+        r_mm = target["r_mm"] 
  
-        if r_m < 0.5 or r_m > 8.0: 
+        if r_mm < CLASSIFY_MIN_RANGE_MM or r_mm > CLASSIFY_MAX_RANGE_MM: 
             return OBJECT_TYPE_GHOST, 0.2 
-        elif speed_m_s > 4.0: 
+        elif speed_cm_s > CLASSIFY_MAX_SPEED_CM_S: 
             return OBJECT_TYPE_GHOST, 0.3 
-        elif speed_m_s < 0.05: 
+        elif speed_cm_s < CLASSIFY_STATIC_SPEED_CM_S: 
             return OBJECT_TYPE_OBJECT, 0.8 
         else: 
             return OBJECT_TYPE_PERSON, 0.85 
  
-    def pack_radar_data(self, target: Dict) -> bytes: 
+    def pack_radar_data(self, target: Dict, object_type: Optional[int] = None) -> bytes: 
         """ 
         Pack one detection in a format aligned with SimulatedRadarService semantics: 
  
@@ -378,25 +592,19 @@ class RadarDataCharacteristic(Characteristic):
  
         # Approximate SNR based on range and clamp to 5–35 dB 
         snr_db = 40.0 - depth_m * 5.0 
-        if snr_db < 5.0: 
-            snr_db = 5.0 
-        elif snr_db > 35.0: 
-            snr_db = 35.0 
+        snr_db = 5.0 if snr_db < 5.0 else (35.0 if snr_db > 35.0 else snr_db) 
  
         # Confidence: ((snr - 5) / 30).coerceIn(0f, 1f) 
-        confidence = (snr_db - 5.0) / 30.0 
-        if confidence < 0.0: 
-            confidence = 0.0 
-        elif confidence > 1.0: 
-            confidence = 1.0 
- 
-        # Use classifier for object type 
-        object_type, _ = self.classify_target(target) 
+        # snr_db is already clamped to 5..35, so this lands in 0..1 
+        confidence = (snr_db - 5.0) * _INV_SNR_SPAN 
+ 
+        # Use classifier for object type unless the caller already has it 
+        if object_type is None: 
+            object_type, _ = self.classify_target(target) 
         object_type_byte = int(object_type) & 0xFF 
  
         # Pack as: x, y, depth, snr, confidence, objectType 
-        packet = struct.pack( 
-            '<fffffB', 
+        packet = _RADAR_PACKET.pack( 
             float(vis_x),      # scaled x 
             float(vis_y),      # scaled y 
             float(depth_m),    # true depth 
@@ -409,37 +617,54 @@ class RadarDataCharacteristic(Characteristic):
         return packet 
  
  
+    def _on_radar_ready(self, fd, condition): 
+        # Drain every pending wakeup byte; the queue holds only the newest frame 
+        try: 
+            while os.read(fd, 64): 
+                pass 
+        except BlockingIOError: 
+            pass 
+        return self.update_radar_data() 
+ 
     def update_radar_data(self): 
         if not self.notifying or not self.radar_queue: 
             return True 
  
-        targets = None 
+        # Queue only ever holds the newest frame (see radar_reader_thread) 
         try: 
-            while not self.radar_queue.empty(): 
-                targets = self.radar_queue.get_nowait() 
+            targets = self.radar_queue.get_nowait() 
         except queue.Empty: 
             targets = None 
  
         if targets: 
             # Choose closest target 
-            sorted_targets = sorted(targets, key=lambda t: t["r_mm"]) 
-            if sorted_targets: 
-                target = sorted_targets[0] 
-                packet = self.pack_radar_data(target) 
- 
-                value = [dbus.Byte(b) for b in packet] 
-                self.update_value(value) 
- 
-                logging.debug( 
-                    "Sent BLE detection: " 
-                    "x=%.2fm, y=%.2fm, depth=%.2fm, snr=%.1fdB", 
-                    target["x_mm"] / 1000.0, 
-                    target["y_mm"] / 1000.0, 
-                    target["r_mm"] / 1000.0, 
-                    40.0 - (target["r_mm"] / 1000.0) * 5.0 
-                ) 
+            target = min(targets, key=lambda t: t["r_mm"]) 
+ 
+            # Skip packing and the DBus signal if nothing moved by >= 1 cm and 
+            # the classification (which also depends on speed) is unchanged 
+            object_type, _ = self.classify_target(target) 
+            key = ( 
+                target["x_mm"] // 10, target["y_mm"] // 10, target["r_mm"] // 10, 
+                object_type, 
+            ) 
+            if key == self._last_key: 
+                return True 
+            self._last_key = key 
  
-        return True  # continue timeout 
+            packet = self.pack_radar_data(target, object_type) 
+ 
+            self.update_value(packet) 
+ 
+            logging.debug( 
+                "Sent BLE detection: " 
+                "x=%.2fm, y=%.2fm, depth=%.2fm, snr=%.1fdB", 
+                target["x_mm"] / 1000.0, 
+                target["y_mm"] / 1000.0, 
+                target["r_mm"] / 1000.0, 
+                40.0 - (target["r_mm"] / 1000.0) * 5.0 
+            ) 
+ 
+        return True  # keep the fd watch 
  
  
 class CommandCharacteristic(Characteristic): 
@@ -506,13 +731,13 @@ class RadarGattServer:
         adapter_props.Set(ADAPTER_IFACE, 'Powered', dbus.Boolean(1)) 
         logging.info("Adapter powered on") 
  
-    def register_app(self, radar_queue: queue.Queue): 
+    def register_app(self, radar_queue: queue.Queue, wake_fd: int): 
         # Create service 
         self.app = Service(self.bus, 0, SERVICE_UUID, True) 
  
         # Create characteristics 
         radar_char = RadarDataCharacteristic(self.bus, 0, self.app) 
-        radar_char.set_radar_queue(radar_queue) 
+        radar_char.set_radar_queue(radar_queue, wake_fd) 
  
         CommandCharacteristic(self.bus, 1, self.app, radar_char) 
  
@@ -564,13 +789,44 @@ class RadarGattServer:
         self.mainloop.run() 
  
  
-def radar_reader_thread(radar: RD03DRadar, data_queue: queue.Queue, stop_event: threading.Event): 
+def set_reader_thread_priority(priority: int = 10): 
+    """Pin the calling thread to the last CPU and give it SCHED_FIFO priority""" 
+    # pid 0 = calling thread on Linux; needs CAP_SYS_NICE (we run under sudo) 
+    try: 
+        cpus = os.sched_getaffinity(0) 
+        if len(cpus) > 1: 
+            os.sched_setaffinity(0, {max(cpus)}) 
+    except (AttributeError, OSError) as e: 
+        logging.warning(f"Could not set reader thread CPU affinity: {e}") 
+ 
+    try: 
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority)) 
+    except (AttributeError, OSError) as e: 
+        logging.warning(f"Could not set reader thread SCHED_FIFO priority: {e}") 
+ 
+ 
+def radar_reader_thread(radar: RD03DRadar, data_queue: queue.Queue, stop_event: threading.Event, 
+                        wake_fd: int): 
+    set_reader_thread_priority() 
     while not stop_event.is_set(): 
-        frame = radar.read_frame() 
-        if frame: 
-            targets = radar.parse_targets(frame) 
-            if targets: 
-                data_queue.put(targets) 
+        targets = radar.read_targets() 
+        if targets: 
+            # Keep only the newest frame; never block the UART reader 
+            try: 
+                data_queue.put_nowait(targets) 
+            except queue.Full: 
+                try: 
+                    data_queue.get_nowait() 
+                except queue.Empty: 
+                    pass 
+                data_queue.put_nowait(targets) 
+ 
+            # Wake the GLib mainloop; if the pipe is full a wakeup is 
+            # already pending, so the write can be dropped 
+            try: 
+                os.write(wake_fd, b'\x01') 
+            except BlockingIOError: 
+                pass 
  
  
 def main(): 
@@ -587,15 +843,27 @@ def main():
         format='[%(asctime)s] %(levelname)s: %(message)s' 
     ) 
 
+    if NATIVE_PARSER_STALE: 
+        logging.warning( 
+            "radar_parse was built from an older radar_kernels.py, ignoring it; " 
+            "re-run build_native.py" 
+        ) 
+ 
     # Initialize radar 
     radar = RD03DRadar(port=args.port, baudrate=args.baud) 
-    data_queue: queue.Queue = queue.Queue(maxsize=10) 
+    data_queue: queue.Queue = queue.Queue(maxsize=1) 
     stop_event = threading.Event() 
 
+    # Pipe the reader thread writes to after each frame so the mainloop 
+    # can wait on it instead of polling the queue 
+    wake_r, wake_w = os.pipe() 
+    os.set_blocking(wake_r, False) 
+    os.set_blocking(wake_w, False) 
+ 
     # Start radar reader thread 
     reader_thread = threading.Thread( 
         target=radar_reader_thread, 
-        args=(radar, data_queue, stop_event), 
+        args=(radar, data_queue, stop_event, wake_w), 
         daemon=True 
     ) 
     reader_thread.start() 
@@ -604,7 +872,7 @@ def main():
     # Initialize and run BLE server 
     try: 
         server = RadarGattServer(args.adapter) 
-        server.register_app(data_queue) 
+        server.register_app(data_queue, wake_r) 
         server.register_ad() 
         logging.info("BLE GATT server running. Press Ctrl+C to stop.") 
         server.run() 
@@ -616,6 +884,8 @@ def main():
         stop_event.set() 
         reader_thread.join() 
         radar.close() 
+        os.close(wake_r) 
+        os.close(wake_w) 
 
 if __name__ == "__main__": 
     main() 
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+"""
+Ahead-of-time build of the RD-03D frame parser
+
+Compiles radar_kernels.consume into a native radar_parse extension module
+next to this script, so Ble_gatt_server.py starts without any JIT warm-up.
+Build on the Raspberry Pi itself (pycc compiles for the host it runs on).
+
+The trade-off: pycc exports always hold the GIL, whereas the JIT kernel
+is compiled with nogil=True, so with radar_parse installed other Python
+threads (the GLib mainloop) are blocked for the length of each consume()
+call. Delete the built radar_parse module to go back to the JIT kernel.
+
+Requirements:
+    pip3 install numpy numba
+
+Run with:
+    python3 build_native.py
+"""
+import argparse
+import os
+
+from numba.pycc import CC
+
+import radar_kernels
+
+# Baked into the module so the server can ignore a build made from an
+# older radar_kernels.py
+KERNEL_HASH = radar_kernels.source_hash()
+
+
+def kernel_hash():
+    return KERNEL_HASH
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the native RD-03D parser")
+    parser.add_argument(
+        "--cpu", default=None,
+        help="LLVM target CPU, e.g. cortex-a72 for a Raspberry Pi 4 "
+             "(default: pycc's generic CPU)"
+    )
+    args = parser.parse_args()
+
+    cc = CC('radar_parse')
+    cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+    if args.cpu:
+        cc.target_cpu = args.cpu
+
+    cc.export('consume', 'UniTuple(i8, 2)(u1[:], i8, i8, i4[:, :])')(radar_kernels.consume)
+    cc.export('kernel_hash', 'i8()')(kernel_hash)
+    cc.compile()
+    print(f"Built radar_parse in {cc.output_dir}")
+
+if __name__ == "__main__":
+    main()
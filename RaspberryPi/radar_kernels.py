@@ -0,0 +1,66 @@
+"""
+Frame-scanning kernel for the RD-03D radar
+
+Plain Python restricted to what Numba's nopython mode supports, so the
+same source is JIT-compiled by Ble_gatt_server.py and AOT-compiled into
+radar_parse by build_native.py.
+"""
+import math
+import zlib
+
+FRAME_LEN = 30
+TARGETS_PER_FRAME = 3
+ROW_LEN = 6  # x_mm, y_mm, r_mm, speed_cm_s, dist_gate_mm, present
+
+
+def source_hash() -> int:
+    """CRC32 of this file; build_native.py stores it in radar_parse"""
+    with open(__file__, 'rb') as f:
+        return zlib.crc32(f.read())
+
+
+def consume(buf, start, end, out):
+    # Scan buf[start:end] for complete frames and decode the newest valid
+    # one into out, one row of ROW_LEN per target slot:
+    #   x_mm, y_mm, r_mm, speed_cm_s, dist_gate_mm, present
+    # present is 1 unless all 8 raw bytes of the slot are zero; a
+    # signed-magnitude +0 (0x8000) is still a reported target
+    # Returns (new_start, n_targets); n_targets is -1 when no complete frame
+    # was found. Bytes from new_start on may still hold the beginning of a
+    # frame and must be kept.
+    n_targets = -1
+    i = start
+    while i + FRAME_LEN <= end:
+        # FRAME_HEADER = AA FF 03 00
+        if not (buf[i] == 0xAA and buf[i + 1] == 0xFF
+                and buf[i + 2] == 0x03 and buf[i + 3] == 0x00):
+            i += 1
+            continue
+
+        # FRAME_TAIL = 55 CC
+        if buf[i + FRAME_LEN - 2] == 0x55 and buf[i + FRAME_LEN - 1] == 0xCC:
+            n_targets = 0
+            for idx in range(TARGETS_PER_FRAME):
+                off = i + 4 + idx * 8
+                x_raw = int(buf[off]) | (int(buf[off + 1]) << 8)
+                y_raw = int(buf[off + 2]) | (int(buf[off + 3]) << 8)
+                v_raw = int(buf[off + 4]) | (int(buf[off + 5]) << 8)
+                d_raw = int(buf[off + 6]) | (int(buf[off + 7]) << 8)
+
+                # x, y and speed are signed-magnitude (bit 15 set = positive)
+                x_mm = (x_raw & 0x7FFF) if x_raw & 0x8000 else -(x_raw & 0x7FFF)
+                y_mm = (y_raw & 0x7FFF) if y_raw & 0x8000 else -(y_raw & 0x7FFF)
+                speed_cm_s = (v_raw & 0x7FFF) if v_raw & 0x8000 else -(v_raw & 0x7FFF)
+
+                out[idx, 0] = x_mm
+                out[idx, 1] = y_mm
+                out[idx, 2] = int(math.sqrt(float(x_mm * x_mm + y_mm * y_mm)))
+                out[idx, 3] = speed_cm_s
+                out[idx, 4] = d_raw
+                if x_raw or y_raw or v_raw or d_raw:
+                    out[idx, 5] = 1
+                    n_targets += 1
+                else:
+                    out[idx, 5] = 0
+        i += FRAME_LEN
+    return i, n_targets